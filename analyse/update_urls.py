@@ -4,7 +4,8 @@ from datetime import datetime
 from pathlib import Path
 from queue import Queue
 
-from mwmbl.indexer import record_urls_in_database
+from mwmbl.indexer.blacklist import get_blacklist
+from mwmbl.indexer.update_urls import record_urls_in_database
 
 
 def run_update_urls_on_fixed_batches():
@@ -16,7 +17,7 @@ def run_update_urls_on_fixed_batches():
     queue = Queue()
 
     start = datetime.now()
-    record_urls_in_database(batches, queue)
+    record_urls_in_database(batches, queue, get_blacklist())
     total_time = (datetime.now() - start).total_seconds()
 
     print("Total time:", total_time)
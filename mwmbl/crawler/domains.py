@@ -2,8 +2,10 @@
 Record which source domains link to destination domains. Each source domain is a bloom filter containing sets of
 destination domains.
 """
+from collections import defaultdict
 from itertools import islice
 from logging import getLogger
+from typing import Optional
 
 from django.conf import settings
 from pybloomfilter import BloomFilter
@@ -36,6 +38,16 @@ def get_bloom_filter(domain_group: str) -> BloomFilter:
     return bloom_filter
 
 
+def get_domain_group(source: str) -> Optional[str]:
+    if source in DOMAIN_GROUPS:
+        return source
+    if source in TOP_DOMAINS:
+        return 'top'
+    if source in OTHER_DOMAINS:
+        return 'other'
+    return None
+
+
 class DomainLinkDatabase:
     def __init__(self):
         self.links = {}
@@ -48,20 +60,19 @@ class DomainLinkDatabase:
         for bloom_filter in self.links.values():
             bloom_filter.close()
 
-    def update_domain_links(self, source: str, target: set[str]):
-        if source in DOMAIN_GROUPS:
-            domain_group = source
-        elif source in TOP_DOMAINS:
-            domain_group = 'top'
-        elif source in OTHER_DOMAINS:
-            domain_group = 'other'
-        else:
-            # This is a URL that we don't care about
-            return
-
-        logger.info(f"Updating domain links for {domain_group} with {target} links")
-        bloom_filter = self.links[domain_group]
-        bloom_filter.update(target)
+    def update_domain_links_bulk(self, domain_links: dict[str, set[str]]):
+        """
+        Update links for many source domains at once, with a single update per domain group bloom filter.
+        """
+        group_targets = defaultdict(set)
+        for source, target in domain_links.items():
+            domain_group = get_domain_group(source)
+            if domain_group is not None:
+                group_targets[domain_group] |= target
+
+        for domain_group, target in group_targets.items():
+            logger.info(f"Updating domain links for {domain_group} with {len(target)} links")
+            self.links[domain_group].update(target)
 
     def get_domain_score(self, domain: str) -> float:
         return sum(1 if domain in bloom_filter else 0 for bloom_filter in self.links.values())
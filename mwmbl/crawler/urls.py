@@ -6,6 +6,7 @@ from datetime import datetime
 from enum import Enum
 from logging import getLogger
 from pathlib import Path
+from typing import Iterable
 
 from django.conf import settings
 from psycopg2.extras import execute_values
@@ -64,7 +65,7 @@ class URLDatabase:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.urls.close()
 
-    def update_found_urls(self, found_urls: list[FoundURL]):
+    def update_found_urls(self, found_urls: Iterable[FoundURL]) -> list[FoundURL]:
         """
         Update URL that have been crawled, and return any that have not yet been crawled
         """
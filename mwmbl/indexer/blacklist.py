@@ -1,4 +1,7 @@
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import timedelta, datetime
+from logging import getLogger
+from typing import Collection, Optional
 
 from requests_cache import CachedSession
 
@@ -6,28 +9,88 @@ from mwmbl.hn_top_domains_filtered import DOMAINS
 from mwmbl.settings import BLACKLIST_DOMAINS_URL, EXCLUDED_DOMAINS, DOMAIN_BLACKLIST_REGEX
 
 
+logger = getLogger(__name__)
+
+
+DIGITS = frozenset("1234567890")
+BLACKLIST_REFRESH_INTERVAL = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class DomainBlacklist:
+    """
+    Domains in `exact` are only blacklisted themselves, while domains in `suffixes` are blacklisted along with all
+    their subdomains.
+    """
+    exact: frozenset[str]
+    suffixes: frozenset[str]
+
+
 def get_blacklist_domains():
     with CachedSession(expire_after=timedelta(days=1)) as session:
         response = session.get(BLACKLIST_DOMAINS_URL)
         return set(response.text.split())
 
 
-def is_domain_blacklisted(domain: str, blacklist_domains: set[str]):
-    if domain in EXCLUDED_DOMAINS or DOMAIN_BLACKLIST_REGEX.search(domain) is not None \
-            or domain in blacklist_domains:
+def compile_blacklist(blacklist_domains: Collection[str]) -> DomainBlacklist:
+    return DomainBlacklist(exact=frozenset(EXCLUDED_DOMAINS), suffixes=frozenset(blacklist_domains))
+
+
+def get_blacklist() -> DomainBlacklist:
+    start = datetime.now()
+    blacklist_domains = get_blacklist_domains()
+    blacklist = compile_blacklist(blacklist_domains)
+    blacklist_retrieval_time = datetime.now() - start
+    logger.info(f"Retrieved {len(blacklist_domains)} blacklist domains in "
+                f"{blacklist_retrieval_time.total_seconds()} seconds")
+    return blacklist
+
+
+class RefreshingBlacklist:
+    """
+    Keeps a compiled blacklist, reloading it once it is older than the refresh interval, so that callers checking
+    domains in a loop don't download and compile it each time. If a reload fails, the previous blacklist is kept.
+    """
+    def __init__(self, refresh_interval: timedelta = BLACKLIST_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._blacklist: Optional[DomainBlacklist] = None
+        self._retrieved: Optional[datetime] = None
+
+    def get(self) -> DomainBlacklist:
+        if self._blacklist is None:
+            self._blacklist = get_blacklist()
+            self._retrieved = datetime.now()
+        elif datetime.now() - self._retrieved > self.refresh_interval:
+            try:
+                self._blacklist = get_blacklist()
+            except Exception:
+                logger.exception("Error refreshing the blacklist, keeping the previous one")
+            # Wait for the next interval before retrying, rather than retrying on every call
+            self._retrieved = datetime.now()
+        return self._blacklist
+
+
+def is_domain_blacklisted(domain: str, blacklist: DomainBlacklist):
+    if domain in blacklist.exact or domain in blacklist.suffixes or DOMAIN_BLACKLIST_REGEX.search(domain) is not None:
         return True
 
     if domain in DOMAINS:
         return False
 
+    # Subdomains of blacklisted domains are also blacklisted. Check each parent domain in turn, which is at most one
+    # set lookup per label rather than a scan of the blacklist.
+    domain_parts = domain.split('.')
+    for i in range(1, len(domain_parts) - 1):
+        if '.'.join(domain_parts[i:]) in blacklist.suffixes:
+            return True
+
     # TODO: this is to filter out spammy domains that look like:
     #           brofqpxj.uelinc.com
     #           gzsmjc.fba01.com
     #           59648.etnomurcia.com
     #
     #       Eventually we can figure out a better way to identify SEO spam
-    domain_parts = domain.split('.')
     if (len(domain_parts) == 3 and domain_parts[2] == "com" and len(domain_parts[0]) in {6, 8}) or (
-        set(domain_parts[0]) <= set("1234567890")
+        set(domain_parts[0]) <= DIGITS
     ):
         return True
@@ -1,11 +1,15 @@
 from collections import defaultdict
-from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
 from logging import getLogger
 from multiprocessing import Queue
 from pathlib import Path
 from time import sleep
-from typing import Collection
-from urllib.parse import urlparse
+from typing import Collection, Optional, Iterable
+
+from ada_url import URL
 
 from mwmbl.crawler.batch import HashedBatch
 from mwmbl.crawler.domains import DomainLinkDatabase
@@ -14,100 +18,128 @@ from mwmbl.database import Database
 from mwmbl.hn_top_domains_filtered import DOMAINS
 from mwmbl.indexer import process_batch
 from mwmbl.indexer.batch_cache import BatchCache
-from mwmbl.indexer.blacklist import get_blacklist_domains, is_domain_blacklisted
+from mwmbl.indexer.blacklist import is_domain_blacklisted, DomainBlacklist, RefreshingBlacklist
 from mwmbl.indexer.index_batches import get_url_error_status
 from mwmbl.indexer.indexdb import BatchStatus
 from mwmbl.indexer.paths import BATCH_DIR_NAME
 from mwmbl.settings import UNKNOWN_DOMAIN_MULTIPLIER, SCORE_FOR_SAME_DOMAIN, \
     SCORE_FOR_DIFFERENT_DOMAIN, SCORE_FOR_ROOT_PATH, EXTRA_LINK_MULTIPLIER
-from mwmbl.utils import get_domain
 
 logger = getLogger(__name__)
 
 
+_db_executor = ThreadPoolExecutor(max_workers=2)
+
+
 def update_urls_continuously(data_path: str, new_item_queue: Queue):
     batch_cache = BatchCache(Path(data_path) / BATCH_DIR_NAME)
+    blacklist = RefreshingBlacklist()
     while True:
         try:
-            run(batch_cache, new_item_queue)
+            run(batch_cache, new_item_queue, blacklist.get())
         except Exception:
             logger.exception("Error updating URLs")
         sleep(10)
 
 
-def run(batch_cache: BatchCache, new_item_queue: Queue):
-    process_batch.run(batch_cache, BatchStatus.LOCAL, BatchStatus.URLS_UPDATED, record_urls_in_database, 100, new_item_queue)
+def run(batch_cache: BatchCache, new_item_queue: Queue, blacklist: DomainBlacklist):
+    process_batch.run(batch_cache, BatchStatus.LOCAL, BatchStatus.URLS_UPDATED, record_urls_in_database, 100,
+                      new_item_queue, blacklist)
 
 
-def record_urls_in_database(batches: Collection[HashedBatch], new_item_queue: Queue):
-    start = datetime.now()
-    blacklist_domains = get_blacklist_domains()
-    blacklist_retrieval_time = datetime.now() - start
-    logger.info(f"Recording URLs in database for {len(batches)} batches, with {len(blacklist_domains)} blacklist "
-                f"domains, retrieved in {blacklist_retrieval_time.total_seconds()} seconds")
+def record_urls_in_database(batches: Collection[HashedBatch], new_item_queue: Queue, blacklist: DomainBlacklist):
+    _parse_link.cache_clear()
+    logger.info(f"Recording URLs in database for {len(batches)} batches")
 
-    url_users = {}
-    url_timestamps = {}
-    url_statuses = defaultdict(lambda: URLStatus.NEW)
+    url_info: dict[str, tuple[str, datetime]] = {}
+    url_statuses: dict[str, URLStatus] = {}
     domain_links = defaultdict(set)
     for batch in batches:
         for item in batch.items:
+            try:
+                crawled_page_domain, _ = _parse_link(item.url)
+            except ValueError:
+                logger.info(f"Couldn't parse URL {item.url}")
+                continue
+
+            if is_domain_blacklisted(crawled_page_domain, blacklist):
+                logger.debug(f"Excluding crawled page for blacklisted domain: {item.url}")
+                continue
+
             timestamp = get_datetime_from_timestamp(item.timestamp / 1000.0)
-            url_timestamps[item.url] = timestamp
-            url_users[item.url] = batch.user_id_hash
+            url_info[item.url] = (batch.user_id_hash, timestamp)
             if item.content is None:
                 url_statuses[item.url] = get_url_error_status(item)
             else:
                 url_statuses[item.url] = URLStatus.CRAWLED
-                try:
-                    crawled_page_domain = get_domain(item.url)
-                except ValueError:
-                    logger.info(f"Couldn't parse URL {item.url}")
-                    continue
-                for link in item.content.links:
-                    process_link(batch.user_id_hash, crawled_page_domain, link, timestamp, url_timestamps, url_users,
-                                 blacklist_domains, domain_links)
-
-                if item.content.extra_links:
-                    for link in item.content.extra_links:
-                        process_link(batch.user_id_hash, crawled_page_domain, link, timestamp, url_timestamps, url_users,
-                                     blacklist_domains, domain_links)
-
-    found_urls = [FoundURL(url, url_users[url], url_statuses[url], url_timestamps[url])
-                  for url in url_statuses.keys() | url_users.keys()]
-
-    logger.info(f"Found URLs, {len(found_urls)}")
-
+                # Pages often contain the same link several times (nav, footer, etc.), so only process each once
+                links = dict.fromkeys(chain(item.content.links, item.content.extra_links or []))
+                link_domains = (process_link(batch.user_id_hash, link, timestamp, url_info, blacklist)
+                                for link in links)
+                domain_links[crawled_page_domain].update(domain for domain in link_domains if domain is not None)
+
+    logger.info(f"Found URLs, {len(url_info)}")
+
+    # Every URL with a status also has user and timestamp info. There can be a lot of URLs, so generate the FoundURLs
+    # as they are needed rather than building a list.
+    found_urls = (FoundURL(url, user_id_hash, url_statuses.get(url, URLStatus.NEW), timestamp)
+                  for url, (user_id_hash, timestamp) in url_info.items())
+
+    # The two databases are independent, so write to them concurrently. Wait for both writes to finish before raising
+    # any error, so that neither is still running when the next run opens the databases.
+    futures = [
+        _db_executor.submit(_update_found_urls, found_urls, new_item_queue),
+        _db_executor.submit(_update_domain_links, domain_links),
+    ]
+    wait(futures)
+    for future in futures:
+        future.result()
+
+
+def _update_found_urls(found_urls: Iterable[FoundURL], new_item_queue: Queue):
     with URLDatabase() as url_db:
         new_urls = url_db.update_found_urls(found_urls)
         new_item_queue.put(new_urls)
         logger.info(f"Put {len(new_urls)} new items in the URL queue")
 
+
+def _update_domain_links(domain_links: dict[str, set[str]]):
     with DomainLinkDatabase() as domain_link_db:
-        for source_domain, target_domains in domain_links.items():
-            domain_link_db.update_domain_links(source_domain, target_domains)
+        domain_link_db.update_domain_links_bulk(domain_links)
 
 
-def process_link(user_id_hash, crawled_page_domain, link, timestamp, url_timestamps, url_users, blacklist_domains,
-                 domain_links):
+def process_link(user_id_hash, link, timestamp, url_info, blacklist: DomainBlacklist) -> Optional[str]:
+    """
+    Record the link and its root URL, returning the domain of the link, or None if it was excluded.
+    """
     try:
-        parsed_link = urlparse(link)
+        domain, root_url = _parse_link(link)
     except ValueError:
         logger.debug(f"Couldn't parse link: {link}")
-        return
+        return None
+
+    if is_domain_blacklisted(domain, blacklist):
+        logger.debug(f"Excluding link for blacklisted domain: {link}")
+        return None
+
+    url_info[link] = (user_id_hash, timestamp)
+    if root_url != link:
+        url_info[root_url] = (user_id_hash, timestamp)
+    return domain
+
 
-    if is_domain_blacklisted(parsed_link.netloc, blacklist_domains):
-        logger.debug(f"Excluding link for blacklisted domain: {parsed_link}")
-        return
+@lru_cache(maxsize=100_000)
+def _parse_link(link: str) -> tuple[str, str]:
+    """
+    The same links turn up on many pages in a batch, and crawled pages are often linked to from other pages, so cache
+    the parts of the parsed URL that we need.
 
-    url_users[link] = user_id_hash
-    url_timestamps[link] = timestamp
-    root_url = f'{parsed_link.scheme}://{parsed_link.netloc}/'
-    url_users[root_url] = user_id_hash
-    url_timestamps[root_url] = timestamp
-    domain_links[crawled_page_domain].add(parsed_link.netloc)
+    Returns the domain of the link, without any port, and its root URL, which keeps the port, so the root URL is
+    only formatted once per distinct link. Raises ValueError if the link is not a valid absolute URL.
+    """
+    parsed_link = URL(link)
+    return parsed_link.hostname, f'{parsed_link.protocol}//{parsed_link.host}/'
 
 
 def get_datetime_from_timestamp(timestamp: float) -> datetime:
-    batch_datetime = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=timestamp)
-    return batch_datetime
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
@@ -131,12 +131,20 @@ def _trim_items_to_page(compressor: ZstdCompressor, page_size: int, items:list[T
 
 
 def _get_page_data(page_size: int, items: list[T]):
+    _, page_data = _get_fitting_page_data(page_size, items)
+    return page_data
+
+
+def _get_fitting_page_data(page_size: int, items: list[T]) -> tuple[int, bytes]:
+    """
+    Get the padded page data, together with the number of items that fit on the page.
+    """
     compressor = ZstdCompressor()
     num_fitting, serialised_data = _trim_items_to_page(compressor, page_size, items)
 
     compressed_data = compressor.compress(json.dumps(items[:num_fitting]).encode('utf8'))
     assert len(compressed_data) <= page_size, "The data shouldn't get bigger"
-    return _pad_to_page_size(compressed_data, page_size)
+    return num_fitting, _pad_to_page_size(compressed_data, page_size)
 
 
 def _pad_to_page_size(data: bytes, page_size: int):
@@ -198,8 +206,14 @@ class TinyIndex(Generic[T]):
         results = self._get_page_tuples(i)
         return [self.item_factory(*item) for item in results]
 
+    def get_page_data(self, i) -> bytes:
+        """
+        Get the raw, compressed data for the page at index i
+        """
+        return self.mmap[i * self.page_size + METADATA_SIZE:(i + 1) * self.page_size + METADATA_SIZE]
+
     def _get_page_tuples(self, i):
-        page_data = self.mmap[i * self.page_size + METADATA_SIZE:(i + 1) * self.page_size + METADATA_SIZE]
+        page_data = self.get_page_data(i)
         decompressor = ZstdDecompressor()
         try:
             decompressed_data = decompressor.decompress(page_data)
@@ -208,21 +222,26 @@ class TinyIndex(Generic[T]):
             return []
         return json.loads(decompressed_data.decode('utf8'))
 
-    def store_in_page(self, page_index: int, values: list[T]):
+    def store_in_page(self, page_index: int, values: list[T]) -> int:
+        """
+        Store the values in the page, returning the number of values that fit
+        """
         value_tuples = [astuple(value) for value in values]
-        self._write_page(value_tuples, page_index)
+        return self._write_page(value_tuples, page_index)
 
-    def _write_page(self, data, i: int):
+    def _write_page(self, data, i: int) -> int:
         """
         Serialise the data using JSON, compress it and store it at index i.
         If the data is too big, it will store the first items in the list and discard the rest.
+        Returns the number of items stored.
         """
         if self.mode != 'w':
             raise UnsupportedOperation("The file is open in read mode, you cannot write")
 
-        page_data = _get_page_data(self.page_size, data)
+        num_fitting, page_data = _get_fitting_page_data(self.page_size, data)
         logger.debug(f"Got page data of length {len(page_data)}")
         self.mmap[i * self.page_size + METADATA_SIZE:(i+1) * self.page_size + METADATA_SIZE] = page_data
+        return num_fitting
 
     @staticmethod
     def create(item_factory: Callable[..., T], index_path: str, num_pages: int, page_size: int):
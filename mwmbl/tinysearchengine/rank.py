@@ -22,6 +22,14 @@ MATCH_EXPONENT = 2
 DOMAIN_SCORE_SMOOTHING = 50
 HTTPS_STRING = 'https://'
 
+# Document states keyed by whether the document is validated and its (lowercase) source
+DOCUMENT_STATES = {
+    (True, "user"): DocumentState.FROM_USER_APPROVED,
+    (True, "google"): DocumentState.FROM_GOOGLE_APPROVED,
+    (False, "user"): DocumentState.FROM_USER,
+    (False, "google"): DocumentState.FROM_GOOGLE,
+}
+
 
 def score_result(terms: list[str], result: Document, is_complete: bool):
     features = get_features(terms, result.title, result.url, result.extract, result.score, is_complete)
@@ -142,6 +150,11 @@ def remove_curate_state(state: DocumentState):
     return state
 
 
+def get_document_state(validated: bool, source: str) -> Optional[DocumentState]:
+    default_state = DocumentState.ORGANIC_APPROVED if validated else None
+    return DOCUMENT_STATES.get((validated, source.lower()), default_state)
+
+
 class Ranker:
     def __init__(self, tiny_index: TinyIndex, completer: Completer):
         self.tiny_index = tiny_index
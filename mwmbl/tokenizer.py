@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 def tokenize(input_text):
     cleaned_text = clean_unicode(input_text)
     tokens = cleaned_text.lower().split()
@@ -7,6 +10,14 @@ def tokenize(input_text):
     return tokens
 
 
+@lru_cache(maxsize=4096)
+def get_query_term(query: str) -> str:
+    """
+    The index term for a query. Curation requests repeatedly send the same query, so the result is cached.
+    """
+    return " ".join(tokenize(query))
+
+
 def get_bigrams(num_bigrams, tokens):
     num_bigrams = min(num_bigrams, len(tokens) - 1)
     bigrams = [f'{tokens[i]} {tokens[i + 1]}' for i in range(num_bigrams)]
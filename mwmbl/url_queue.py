@@ -11,7 +11,7 @@ from mwmbl.crawler.domains import DomainLinkDatabase
 from mwmbl.crawler.urls import BATCH_SIZE, URLDatabase, URLStatus, FoundURL, REASSIGN_MIN_HOURS
 from mwmbl.database import Database
 from mwmbl.hn_top_domains_filtered import DOMAINS as TOP_DOMAINS, DOMAINS
-from mwmbl.indexer.blacklist import is_domain_blacklisted, get_blacklist_domains
+from mwmbl.indexer.blacklist import is_domain_blacklisted, DomainBlacklist, RefreshingBlacklist
 from mwmbl.settings import CORE_DOMAINS
 from mwmbl.utils import batch, get_domain
 
@@ -43,10 +43,11 @@ class URLQueue:
         self._other_urls = defaultdict(dict)
         self._top_urls = defaultdict(dict)
         self._min_top_domains = min_top_domains
+        self._blacklist = RefreshingBlacklist()
         assert min_top_domains > 0, "Need a minimum greater than 0 to prevent a never-ending loop"
 
     def update(self):
-        blacklist_domains = get_blacklist_domains()
+        blacklist = self._blacklist.get()
         num_processed = 0
         while True:
             try:
@@ -54,16 +55,16 @@ class URLQueue:
                 num_processed += 1
             except Empty:
                 break
-            self._process_found_urls(new_batch, blacklist_domains)
+            self._process_found_urls(new_batch, blacklist)
         return num_processed
 
-    def _process_found_urls(self, found_urls: list[FoundURL], blacklist_domains: set[str]):
+    def _process_found_urls(self, found_urls: list[FoundURL], blacklist: DomainBlacklist):
         logger.info(f"Found URLS: {len(found_urls)}")
         logger.info(f"Found: {found_urls[:100]}")
         valid_urls = [found_url for found_url in found_urls if found_url.status == URLStatus.NEW]
         logger.info(f"Valid URLs: {len(valid_urls)}")
 
-        self._sort_urls(valid_urls, blacklist_domains)
+        self._sort_urls(valid_urls, blacklist)
         logger.info(f"Queue size: {self.num_queued_batches}")
         while self.num_queued_batches < MAX_QUEUE_SIZE and len(self._top_urls) >= self._min_top_domains:
             total_top_urls = sum(len(urls) for urls in self._top_urls.values())
@@ -75,14 +76,14 @@ class URLQueue:
             self._batch_urls()
             logger.info(f"Queue size after batching: {self.num_queued_batches}")
 
-    def _sort_urls(self, valid_urls: list[FoundURL], blacklist_domains: set[str]):
+    def _sort_urls(self, valid_urls: list[FoundURL], blacklist: DomainBlacklist):
         with DomainLinkDatabase() as link_db:
             for found_url in valid_urls:
                 try:
                     domain = get_domain(found_url.url)
                 except ValueError:
                     continue
-                if is_domain_blacklisted(domain, blacklist_domains):
+                if is_domain_blacklisted(domain, blacklist):
                     continue
                 if domain in TOP_DOMAINS:
                     self._top_urls[domain][found_url.url] = 1/len(found_url.url)
@@ -1,10 +1,10 @@
-import re
+from collections import OrderedDict
+
+from ada_url import URL
 
 from mwmbl.indexer.index import tokenize_document
 from mwmbl.tinysearchengine.indexer import Document, TinyIndex
 
-DOMAIN_REGEX = re.compile(r".*://([^/]*)")
-
 
 def batch(items: list, batch_size):
     """
@@ -16,10 +16,13 @@ def batch(items: list, batch_size):
 
 
 def get_domain(url):
-    results = DOMAIN_REGEX.match(url)
-    if results is None or len(results.groups()) == 0:
+    """
+    Domains are lowercased and punycoded and have no port, the same as the domains recorded when updating URLs.
+    """
+    try:
+        return URL(url).hostname
+    except ValueError:
         raise ValueError(f"Unable to parse domain from URL {url}")
-    return results.group(1)
 
 
 def add_term_info(document: Document, index: TinyIndex, page_index: int):
@@ -40,3 +43,36 @@ def add_term_infos(documents: list[Document], index: TinyIndex, page_index: int)
             yield add_term_info(document, index, page_index)
         except ValueError:
             continue
+
+
+class PageDocumentCache:
+    """
+    Cache the documents, with term info added, of recently used index pages, along with the raw page data that they
+    were decoded from. The index is also written by other processes, so an entry is only used if its page is unchanged.
+    """
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self._pages: OrderedDict[int, tuple[bytes, list[Document]]] = OrderedDict()
+
+    def get_documents_with_terms(self, index: TinyIndex, page_index: int) -> list[Document]:
+        """
+        Get the documents in a page with term info added. A cached entry is removed when it is used since the caller
+        may modify the documents; it is cached again when the page is stored.
+        """
+        page_data = index.get_page_data(page_index)
+        cached = self._pages.pop(page_index, None)
+        if cached is not None and cached[0] == page_data:
+            return cached[1]
+
+        documents = index.get_page(page_index)
+        return list(add_term_infos(documents, index, page_index))
+
+    def store(self, index: TinyIndex, page_index: int, documents: list[Document]):
+        """
+        Store the documents in the page, caching those that fit.
+        """
+        num_stored = index.store_in_page(page_index, documents)
+        self._pages[page_index] = (index.get_page_data(page_index), documents[:num_stored])
+        self._pages.move_to_end(page_index)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
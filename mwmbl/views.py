@@ -1,6 +1,6 @@
 from dataclasses import asdict
 from datetime import datetime
-from logging import getLogger
+from logging import getLogger, INFO
 from typing import Optional
 from urllib.parse import urlencode
 
@@ -21,15 +21,21 @@ from mwmbl.search_setup import ranker, index_path
 from mwmbl.settings import NUM_EXTRACT_CHARS
 from mwmbl.tinysearchengine.indexer import Document, DocumentState, TinyIndex
 from mwmbl.tinysearchengine.rank import fix_document_state
-from mwmbl.tokenizer import tokenize
-from mwmbl.utils import add_term_infos
+from mwmbl.tokenizer import get_query_term
+from mwmbl.utils import PageDocumentCache
 
 MAX_CURATED_SCORE = 1_111_111.0
+MAX_CACHED_PAGES = 1024
+
 
 
 logger = getLogger(__name__)
 
 
+# Curation sessions repeatedly save to the same index page, so cache the documents of recently used pages
+_page_cache = PageDocumentCache(MAX_CACHED_PAGES)
+
+
 def justext_with_dom(html_text, stoplist, length_low=LENGTH_LOW_DEFAULT,
         length_high=LENGTH_HIGH_DEFAULT, stopwords_low=STOPWORDS_LOW_DEFAULT,
         stopwords_high=STOPWORDS_HIGH_DEFAULT, max_link_density=MAX_LINK_DENSITY_DEFAULT,
@@ -95,7 +101,7 @@ def _get_results_and_activity(request):
         urls = request.GET.getlist(f"url")
         extracts = request.GET.getlist(f"extract")
 
-        term = " ".join(tokenize(query))
+        term = get_query_term(query)
 
         # For now, we only support the Google source
         additional_results = [
@@ -129,7 +135,7 @@ def add_url(request):
     if len(extract) > NUM_EXTRACT_CHARS:
         extract = extract[:NUM_EXTRACT_CHARS - 1] + '…'
 
-    term = " ".join(tokenize(query))
+    term = get_query_term(query)
     result = Document(title=title, url=new_url, extract=extract, score=0.0, term=term, state=DocumentState.FROM_USER_APPROVED)
 
     documents = _get_documents(request, term)
@@ -168,7 +174,7 @@ def approve(request):
     approve_url = request.POST.get("approve_url")
     query = request.POST.get("query")
 
-    term = " ".join(tokenize(query))
+    term = get_query_term(query)
     documents = _get_documents(request, term)
 
     # The approved Document should be pushed below the last Document with status > 0
@@ -207,7 +213,7 @@ def revert_current_curation(request):
     query = curation.query
 
     with TinyIndex(Document, index_path, 'w') as indexer:
-        term = " ".join(tokenize(query))
+        term = get_query_term(query)
         documents = [Document(**doc) for doc in curation.original_index_results]
 
         page_index = indexer.get_key_page_index(term)
@@ -246,8 +252,7 @@ def _get_curation(request, query, documents, reranked_documents):
             user = None
 
         with TinyIndex(Document, index_path, 'r') as indexer:
-            tokens = tokenize(query)
-            term = " ".join(tokens)
+            term = get_query_term(query)
             original_index_results = [doc for doc in indexer.retrieve(term) if doc.term == term]
 
         curation = Curation(
@@ -300,7 +305,7 @@ def _get_documents(request, term: str):
 
 def _save_to_index(query: str, new_results: list[Document]):
     with TinyIndex(Document, index_path, 'w') as indexer:
-        term = " ".join(tokenize(query))
+        term = get_query_term(query)
         documents = [
             Document(
                 title=result.title,
@@ -315,36 +320,22 @@ def _save_to_index(query: str, new_results: list[Document]):
         ]
 
         page_index = indexer.get_key_page_index(term)
-        existing_documents_no_terms = indexer.get_page(page_index)
-        existing_documents = add_term_infos(existing_documents_no_terms, indexer, page_index)
+        existing_documents = _page_cache.get_documents_with_terms(indexer, page_index)
         new_urls = {doc.url for doc in documents}
-        other_documents = [doc for doc in existing_documents if doc.url not in new_urls]
-        logger.info(f"Found {len(other_documents)} other documents for term {term} at page {page_index} "
-                    f"with terms { {doc.term for doc in other_documents} }")
-
-        # Update state for other documents
         states = {doc.url: doc.state for doc in new_results}
-        for doc in other_documents:
-            doc.state = states.get(doc.url, doc.state)
+        other_documents = []
+        for doc in existing_documents:
+            if doc.url not in new_urls:
+                # Update state for other documents
+                doc.state = states.get(doc.url, doc.state)
+                other_documents.append(doc)
+
+        if logger.isEnabledFor(INFO):
+            logger.info(f"Found {len(other_documents)} other documents for term {term} at page {page_index} "
+                        f"with terms { {doc.term for doc in other_documents} }")
 
         all_documents = documents + other_documents
         logger.info(f"Storing {len(all_documents)} documents at page {page_index}")
-        indexer.store_in_page(page_index, all_documents)
+        _page_cache.store(indexer, page_index, all_documents)
 
     return {"curation": "ok"}
-
-
-def _get_document_state(validated: bool, source: str) -> Optional[DocumentState]:
-    if validated:
-        if source.lower() == "user":
-            return DocumentState.FROM_USER_APPROVED
-        elif source.lower() == "google":
-            return DocumentState.FROM_GOOGLE_APPROVED
-        else:
-            return DocumentState.ORGANIC_APPROVED
-    elif source.lower() == "user":
-        return DocumentState.FROM_USER
-    elif source.lower() == "google":
-        return DocumentState.FROM_GOOGLE
-    else:
-        return None
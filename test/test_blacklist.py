@@ -1,4 +1,8 @@
-from mwmbl.indexer.blacklist import is_domain_blacklisted
+from datetime import timedelta
+
+import pytest
+
+from mwmbl.indexer.blacklist import is_domain_blacklisted, compile_blacklist, RefreshingBlacklist
 
 
 def test_blacklist_excludes_bad_pattern():
@@ -10,12 +14,66 @@ def test_blacklist_excludes_bad_pattern():
     ]
 
     for domain in bad_domains:
-        assert is_domain_blacklisted(domain, set())
+        assert is_domain_blacklisted(domain, compile_blacklist(set()))
 
 
 def test_blacklist_allows_top_domains():
-    assert not is_domain_blacklisted("teamblog.supportbee.com", set())
+    assert not is_domain_blacklisted("teamblog.supportbee.com", compile_blacklist(set()))
 
 
 def test_blacklist_allows_other_domains():
-    assert not is_domain_blacklisted("something.com", set())
+    assert not is_domain_blacklisted("something.com", compile_blacklist(set()))
+
+
+def test_blacklist_excludes_subdomains():
+    assert is_domain_blacklisted("www.spammy.net", compile_blacklist({"spammy.net"}))
+    assert is_domain_blacklisted("a.b.spammy.net", compile_blacklist({"spammy.net"}))
+
+
+def test_blacklist_does_not_match_top_level_domain():
+    assert not is_domain_blacklisted("something.net", compile_blacklist({"net"}))
+
+
+def test_refreshing_blacklist_reuses_blacklist_within_interval(mocker):
+    get_blacklist_domains = mocker.patch('mwmbl.indexer.blacklist.get_blacklist_domains', return_value={"spammy.net"})
+    blacklist = RefreshingBlacklist()
+
+    first = blacklist.get()
+    second = blacklist.get()
+
+    assert first is second
+    assert first.suffixes == {"spammy.net"}
+    get_blacklist_domains.assert_called_once()
+
+
+def test_refreshing_blacklist_reloads_after_interval(mocker):
+    get_blacklist_domains = mocker.patch('mwmbl.indexer.blacklist.get_blacklist_domains',
+                                         side_effect=[{"spammy.net"}, {"other.net"}])
+    blacklist = RefreshingBlacklist(refresh_interval=timedelta(0))
+
+    blacklist.get()
+    refreshed = blacklist.get()
+
+    assert refreshed.suffixes == {"other.net"}
+    assert get_blacklist_domains.call_count == 2
+
+
+def test_refreshing_blacklist_keeps_previous_blacklist_when_refresh_fails(mocker):
+    previous = compile_blacklist({"spammy.net"})
+    get_blacklist = mocker.patch('mwmbl.indexer.blacklist.get_blacklist',
+                                 side_effect=[previous, RuntimeError("Blacklist unavailable")])
+    blacklist = RefreshingBlacklist(refresh_interval=timedelta(0))
+
+    blacklist.get()
+    refreshed = blacklist.get()
+
+    assert refreshed is previous
+    assert get_blacklist.call_count == 2
+
+
+def test_refreshing_blacklist_raises_when_first_load_fails(mocker):
+    mocker.patch('mwmbl.indexer.blacklist.get_blacklist', side_effect=RuntimeError("Blacklist unavailable"))
+    blacklist = RefreshingBlacklist()
+
+    with pytest.raises(RuntimeError):
+        blacklist.get()
@@ -0,0 +1,26 @@
+from mwmbl.crawler.domains import DomainLinkDatabase, DOMAIN_GROUPS, TOP_DOMAINS, OTHER_DOMAINS
+
+
+def test_update_domain_links_bulk_merges_sources_by_group():
+    top_sources = sorted(TOP_DOMAINS - set(DOMAIN_GROUPS))[:2]
+    other_source = sorted(OTHER_DOMAINS - set(DOMAIN_GROUPS))[0]
+    domain_links = DomainLinkDatabase()
+    domain_links.links = {domain_group: set() for domain_group in DOMAIN_GROUPS}
+
+    domain_links.update_domain_links_bulk({
+        'github.com': {'example.com'},
+        top_sources[0]: {'a.com', 'b.com'},
+        top_sources[1]: {'b.com', 'c.com'},
+        other_source: {'d.com'},
+        'unknown-source.example': {'e.com'},
+    })
+
+    assert domain_links.links == {
+        'github.com': {'example.com'},
+        'en.wikipedia.org': set(),
+        'news.ycombinator.com': set(),
+        'lemmy.ml': set(),
+        'mastodon.social': set(),
+        'top': {'a.com', 'b.com', 'c.com'},
+        'other': {'d.com'},
+    }
@@ -123,3 +123,21 @@ def test_constructing_document_removes_none():
     document = Document(title=None,url='url',extract=None,score=1.0)
     assert document.title == ''
     assert document.extract == ''
+
+
+def test_store_in_page_returns_number_stored():
+    num_pages = 10
+    page_size = 4096
+    documents = [Document(title=f'text{x}', url=f'text{x}', extract=f'text{x}', score=x) for x in range(5000)]
+
+    with TemporaryDirectory() as temp_dir:
+        index_path = Path(temp_dir) / 'temp-index.tinysearch'
+        TinyIndex.create(Document, str(index_path), num_pages=num_pages, page_size=page_size)
+        with TinyIndex(Document, str(index_path), 'w') as indexer:
+            num_stored = indexer.store_in_page(0, documents)
+            page = indexer.get_page(0)
+            page_data = indexer.get_page_data(0)
+
+    assert 1 < num_stored < len(documents)
+    assert page == documents[:num_stored]
+    assert len(page_data) == page_size
@@ -1,5 +1,5 @@
-from mwmbl.tinysearchengine.indexer import Document
-from mwmbl.tinysearchengine.rank import order_results
+from mwmbl.tinysearchengine.indexer import Document, DocumentState
+from mwmbl.tinysearchengine.rank import order_results, get_document_state
 
 
 def test_order_result():
@@ -13,3 +13,19 @@ def test_order_result():
     ordered_results = order_results(["bananas"], documents, True)
 
     assert ordered_results[0].title == 'Bananas and apples'
+
+
+def test_get_document_state_validated():
+    assert get_document_state(True, "user") == DocumentState.FROM_USER_APPROVED
+    assert get_document_state(True, "User") == DocumentState.FROM_USER_APPROVED
+    assert get_document_state(True, "google") == DocumentState.FROM_GOOGLE_APPROVED
+    assert get_document_state(True, "Google") == DocumentState.FROM_GOOGLE_APPROVED
+    assert get_document_state(True, "unknown") == DocumentState.ORGANIC_APPROVED
+
+
+def test_get_document_state_not_validated():
+    assert get_document_state(False, "user") == DocumentState.FROM_USER
+    assert get_document_state(False, "User") == DocumentState.FROM_USER
+    assert get_document_state(False, "google") == DocumentState.FROM_GOOGLE
+    assert get_document_state(False, "GOOGLE") == DocumentState.FROM_GOOGLE
+    assert get_document_state(False, "unknown") is None
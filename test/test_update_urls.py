@@ -1,46 +1,106 @@
-from collections import defaultdict
+from queue import Queue
+from threading import Event
+from time import sleep
 
-from mwmbl.indexer.update_urls import process_link
+import pytest
+
+from mwmbl.indexer.blacklist import compile_blacklist
+from mwmbl.indexer.update_urls import process_link, record_urls_in_database
 
 
 def test_process_link_normal():
-    url_scores = {"https://somesite.com/something.html": 0.0, "https://somesite.com/": 0.0}
-    url_timestamps = {}
-    url_users = {}
-    domain_links = defaultdict(set)
+    url_info = {}
 
-    process_link(
+    domain = process_link(
         user_id_hash="abc123",
-        crawled_page_domain="somewhere.com",
         link="https://somesite.com/something.html",
         timestamp=1234,
-        url_timestamps=url_timestamps,
-        url_users=url_users,
-        blacklist_domains=[],
-        domain_links=domain_links,
+        url_info=url_info,
+        blacklist=compile_blacklist([]),
     )
 
-    assert domain_links == {"somewhere.com": {"somesite.com"}}
+    assert domain == "somesite.com"
+    assert url_info == {
+        "https://somesite.com/something.html": ("abc123", 1234),
+        "https://somesite.com/": ("abc123", 1234),
+    }
 
 
 def test_process_link_excludes_porn():
-    url_scores = {}
-    url_timestamps = {}
-    url_users = {}
-    domain_links = {}
+    url_info = {}
 
-    process_link(
+    domain = process_link(
         user_id_hash="abc123",
-        crawled_page_domain="somewhere.com",
         link="https://somepornsite.com/something.html",
         timestamp=1234,
-        url_timestamps=url_timestamps,
-        url_users=url_users,
-        blacklist_domains=[],
-        domain_links=domain_links,
+        url_info=url_info,
+        blacklist=compile_blacklist([]),
     )
 
-    assert url_scores == {}
-    assert url_timestamps == {}
-    assert url_users == {}
-    assert domain_links == {}
+    assert domain is None
+    assert url_info == {}
+
+
+def test_process_link_root_url():
+    url_info = {}
+
+    domain = process_link(
+        user_id_hash="abc123",
+        link="https://somesite.com/",
+        timestamp=1234,
+        url_info=url_info,
+        blacklist=compile_blacklist([]),
+    )
+
+    assert domain == "somesite.com"
+    assert url_info == {"https://somesite.com/": ("abc123", 1234)}
+
+
+def test_process_link_with_port():
+    url_info = {}
+
+    domain = process_link(
+        user_id_hash="abc123",
+        link="https://somesite.com:8443/something.html",
+        timestamp=1234,
+        url_info=url_info,
+        blacklist=compile_blacklist([]),
+    )
+
+    assert domain == "somesite.com"
+    assert url_info == {
+        "https://somesite.com:8443/something.html": ("abc123", 1234),
+        "https://somesite.com:8443/": ("abc123", 1234),
+    }
+
+
+def test_process_link_excludes_blacklisted_domain_with_port():
+    for link in ["https://spammy.net:8443/", "https://www.spammy.net:8443/something.html"]:
+        url_info = {}
+
+        domain = process_link(
+            user_id_hash="abc123",
+            link=link,
+            timestamp=1234,
+            url_info=url_info,
+            blacklist=compile_blacklist({"spammy.net"}),
+        )
+
+        assert domain is None
+        assert url_info == {}
+
+
+def test_record_urls_in_database_waits_for_writes_before_raising(mocker):
+    domain_links_written = Event()
+
+    def update_domain_links(domain_links):
+        sleep(0.1)
+        domain_links_written.set()
+
+    mocker.patch('mwmbl.indexer.update_urls._update_found_urls', side_effect=RuntimeError("URL database error"))
+    mocker.patch('mwmbl.indexer.update_urls._update_domain_links', side_effect=update_domain_links)
+
+    with pytest.raises(RuntimeError):
+        record_urls_in_database([], Queue(), compile_blacklist([]))
+
+    assert domain_links_written.is_set()
@@ -0,0 +1,95 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from mwmbl.tinysearchengine.indexer import TinyIndex, Document
+from mwmbl.utils import PageDocumentCache, get_domain
+
+
+NUM_PAGES = 10
+PAGE_SIZE = 4096
+
+
+@pytest.fixture
+def indexer():
+    with TemporaryDirectory() as temp_dir:
+        index_path = str(Path(temp_dir) / 'temp-index.tinysearch')
+        TinyIndex.create(Document, index_path, num_pages=NUM_PAGES, page_size=PAGE_SIZE)
+        with TinyIndex(Document, index_path, 'w') as indexer:
+            yield indexer
+
+
+def make_documents(num_documents: int, prefix: str = 'text'):
+    return [Document(title=f'{prefix}{x}', url=f'{prefix}{x}', extract=f'{prefix}{x}', score=x, term='term')
+            for x in range(num_documents)]
+
+
+def test_page_document_cache_hit_returns_stored_documents(indexer):
+    cache = PageDocumentCache(max_pages=10)
+    documents = make_documents(3)
+    cache.store(indexer, 0, documents)
+
+    cached_documents = cache.get_documents_with_terms(indexer, 0)
+
+    assert cached_documents == documents
+    assert all(cached is stored for cached, stored in zip(cached_documents, documents))
+
+
+def test_page_document_cache_miss_when_page_written_elsewhere(indexer):
+    cache = PageDocumentCache(max_pages=10)
+    cache.store(indexer, 0, make_documents(3))
+    new_documents = make_documents(2, prefix='new')
+    indexer.store_in_page(0, new_documents)
+
+    cached_documents = cache.get_documents_with_terms(indexer, 0)
+
+    assert cached_documents == new_documents
+
+
+def test_page_document_cache_entry_is_used_once(indexer):
+    cache = PageDocumentCache(max_pages=10)
+    documents = make_documents(3)
+    cache.store(indexer, 0, documents)
+
+    cache.get_documents_with_terms(indexer, 0)
+    cached_documents = cache.get_documents_with_terms(indexer, 0)
+
+    assert cached_documents == documents
+    assert cached_documents[0] is not documents[0]
+
+
+def test_page_document_cache_only_keeps_stored_documents(indexer):
+    cache = PageDocumentCache(max_pages=10)
+    documents = make_documents(5000)
+    cache.store(indexer, 0, documents)
+
+    cached_documents = cache.get_documents_with_terms(indexer, 0)
+
+    assert 1 < len(cached_documents) < len(documents)
+    assert cached_documents == indexer.get_page(0)
+
+
+def test_page_document_cache_evicts_least_recently_stored(indexer):
+    cache = PageDocumentCache(max_pages=2)
+    documents = {page_index: make_documents(3, prefix=f'page{page_index}-') for page_index in range(3)}
+    for page_index, page_documents in documents.items():
+        cache.store(indexer, page_index, page_documents)
+
+    evicted_documents = cache.get_documents_with_terms(indexer, 0)
+    cached_documents = cache.get_documents_with_terms(indexer, 2)
+
+    assert evicted_documents == documents[0]
+    assert evicted_documents[0] is not documents[0][0]
+    assert cached_documents[0] is documents[2][0]
+
+
+def test_get_domain_normalises_host():
+    assert get_domain("https://Example.com/x") == "example.com"
+    assert get_domain("https://bücher.de/") == "xn--bcher-kva.de"
+    assert get_domain("https://example.com:8443/x") == "example.com"
+
+
+def test_get_domain_invalid_url():
+    with pytest.raises(ValueError):
+        get_domain("not a url")